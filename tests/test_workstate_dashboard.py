@@ -1,8 +1,14 @@
 import copy
+import gzip
+import http.client
+import io
 import json
+import os
 import runpy
 import shutil
+import socket
 import sys
+import threading
 import time
 import unittest
 import uuid
@@ -25,6 +31,9 @@ class WorkstateDashboardTests(unittest.TestCase):
     def setUp(self):
         self.globals["sessions"].clear()
         self.globals["expired"].clear()
+        self.globals["_sessions_json_cache"].update({"entry": None, "ts": 0, "dirty": True})
+        self.globals["_expiry_heap"].clear()
+        self.globals["_expiry_armed"].clear()
         self.original_warn_seconds = self.globals["WARN_SECONDS"]
         self.original_stale_seconds = self.globals["STALE_SECONDS"]
         self.original_service_cache = copy.deepcopy(self.globals["_service_status_cache"])
@@ -65,12 +74,20 @@ class WorkstateDashboardTests(unittest.TestCase):
         self.globals["IDLE_THRESHOLD_SEC"] = self.original_idle_threshold
 
     def test_staleness_thresholds(self):
-        now_iso = self.mod["now_iso"]()
-        self.assertEqual(self.mod["staleness"](now_iso), "ok")
+        self.assertEqual(self.mod["staleness"](0), "ok")
 
         self.globals["WARN_SECONDS"] = 1
         self.globals["STALE_SECONDS"] = 2
-        self.assertEqual(self.mod["staleness"]("1970-01-01T00:00:00+00:00"), "idle")
+        self.assertEqual(self.mod["staleness"](1.5), "warning")
+        self.assertEqual(self.mod["staleness"](time.time()), "idle")
+
+    def test_relative_time_buckets(self):
+        relative_time = self.mod["relative_time"]
+        self.assertEqual(relative_time(-3), "0s ago")
+        self.assertEqual(relative_time(59.9), "59s ago")
+        self.assertEqual(relative_time(60), "1m ago")
+        self.assertEqual(relative_time(3599), "59m ago")
+        self.assertEqual(relative_time(7200), "2h ago")
 
     def test_session_lifecycle(self):
         upsert = self.mod["upsert_session"]
@@ -85,11 +102,109 @@ class WorkstateDashboardTests(unittest.TestCase):
         self.assertEqual(self.globals["sessions"]["s1"].task, "t2")
         self.assertEqual(self.globals["sessions"]["s1"].history[-1], "t1")
 
+        for i in range(3, 10):
+            upsert({"session_id": "s1", "task": f"t{i}"})
+        history = self.globals["sessions"]["s1"].history
+        self.assertEqual(list(history), ["t4", "t5", "t6", "t7", "t8"])
+
         body, code = upsert({"session_id": "s1", "status": "Done", "task": "done"})
         self.assertEqual(code, 200)
         self.assertNotIn("s1", self.globals["sessions"])
         self.assertGreaterEqual(len(self.globals["expired"]), 1)
 
+    def test_session_records_are_slotted(self):
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1"})
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "t1"})
+        session = self.globals["sessions"]["s1"]
+        self.assertFalse(hasattr(session, "__dict__"))
+        self.assertFalse(hasattr(session.threads["t1"], "__dict__"))
+
+    def test_expired_listed_newest_first_within_purge_window(self):
+        upsert = self.mod["upsert_session"]
+        for name in ("first", "second", "third"):
+            upsert({"session_id": name, "name": name, "status": "Done"})
+        self.globals["expired"][0]["expired_ts"] -= self.globals["PURGE_SECONDS"]
+
+        payload = self.mod["get_sessions_json"]()
+
+        self.assertEqual([e["name"] for e in payload["expired"]], ["third", "second"])
+
+    def test_writers_do_not_mutate_published_snapshots(self):
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1", "task": "t1"})
+        snapshot = self.globals["sessions"]
+        threads_snapshot = snapshot["s1"].threads
+
+        upsert({"session_id": "s2", "name": "session-2", "task": "t2"})
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "thread-1"})
+
+        self.assertNotIn("s2", snapshot)
+        self.assertIn("s2", self.globals["sessions"])
+        self.assertEqual(threads_snapshot, {})
+        self.assertIn("thread-1", self.globals["sessions"]["s1"].threads)
+
+    def test_known_session_update_keeps_published_dict(self):
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1", "task": "t1"})
+        snapshot = self.globals["sessions"]
+
+        body, code = upsert({"session_id": "s1", "task": "t1"})
+        self.assertEqual(code, 200)
+        self.assertEqual(body["name"], "session-1")
+        self.assertIs(self.globals["sessions"], snapshot)
+
+        upsert({"session_id": "s1", "status": "Done"})
+        self.assertIsNot(self.globals["sessions"], snapshot)
+        self.assertIn("s1", snapshot)
+
+    def test_sweep_expires_only_threads_past_their_deadline(self):
+        upsert = self.mod["upsert_session"]
+        expire = self.globals["EXPIRE_SECONDS"]
+        upsert({"session_id": "s1", "name": "session-1", "task": "t1"})
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "old"})
+        upsert({"session_id": "c2", "parent_id": "s1", "thread_id": "fresh"})
+        threads = self.globals["sessions"]["s1"].threads
+        threads["fresh"].last_seen_ts += 60  # heartbeat after it was armed
+        upsert({"session_id": "s2", "name": "session-2", "status": "Done"})
+
+        self.mod["sweep_expired"](time.time() + expire + 1)
+
+        remaining = self.globals["sessions"]["s1"].threads
+        self.assertNotIn("old", remaining)
+        self.assertIn("fresh", remaining)
+        self.assertEqual(len(self.globals["_expiry_heap"]), 1)
+        self.assertEqual(len(self.globals["expired"]), 0)  # past PURGE_SECONDS
+
+    def test_next_sweep_delay_tracks_earliest_deadline(self):
+        delay = self.mod["_next_sweep_delay"]
+        purge = self.globals["PURGE_SECONDS"]
+        expire = self.globals["EXPIRE_SECONDS"]
+        now = time.time()
+        self.assertEqual(delay(now), purge)
+
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1"})
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "t1"})
+        thread = self.globals["sessions"]["s1"].threads["t1"]
+        self.assertAlmostEqual(delay(now), min(purge, thread.last_seen_ts + expire - now))
+        self.assertEqual(delay(now + expire + 1), 0.0)
+
+    def test_done_thread_is_removed_and_never_inserted(self):
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1", "task": "t1"})
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "a"})
+        upsert({"session_id": "c2", "parent_id": "s1", "thread_id": "b"})
+
+        upsert({"session_id": "c1", "parent_id": "s1", "thread_id": "a", "status": "Done"})
+        body, code = upsert(
+            {"session_id": "c3", "parent_id": "s1", "thread_id": "c", "status": "Done"}
+        )
+
+        self.assertEqual(code, 200)
+        self.assertEqual(body["thread_id"], "c")
+        self.assertEqual(list(self.globals["sessions"]["s1"].threads), ["b"])
+
     def test_template_file_present(self):
         template = Path(__file__).resolve().parents[1] / "tools" / "workstate-dashboard.template.html"
         self.assertTrue(template.exists())
@@ -130,6 +245,122 @@ class WorkstateDashboardTests(unittest.TestCase):
         self.assertIn("service_groups", payload["dashboard"])
         self.assertIn("page_groups", payload["dashboard"])
 
+    def test_get_sessions_json_builds_session_and_thread_rows(self):
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "parent", "name": "session-1", "task": "t1"})
+        upsert(
+            {
+                "session_id": "child",
+                "parent_id": "parent",
+                "thread_id": "thread-1",
+                "name": "worker",
+                "task": "background task",
+            }
+        )
+
+        payload = self.mod["get_sessions_json"]()
+
+        session = payload["sessions"][0]
+        self.assertEqual(session["session_id"], "parent")
+        self.assertEqual(session["staleness"], "ok")
+        self.assertTrue(session["last_seen_relative"].endswith("s ago"))
+        self.assertEqual(session["status_class"], "status-running")
+        self.assertEqual(session["dot_class"], "dot-ok")
+        thread = session["threads"][0]
+        self.assertEqual(thread["thread_id"], "thread-1")
+        self.assertEqual(thread["task"], "background task")
+        self.assertEqual(thread["staleness"], "ok")
+
+    def test_row_staleness_and_relative_time_buckets(self):
+        self.mod["upsert_session"]({"session_id": "s1", "name": "session-1"})
+        session = self.globals["sessions"]["s1"]
+        cases = [
+            (-1, "ok", "0s ago"),
+            (59.5, "ok", "59s ago"),
+            (60, "warning", "1m ago"),
+            (179, "warning", "2m ago"),
+            (180, "idle", "3m ago"),
+            (3599, "idle", "59m ago"),
+            (3600, "idle", "1h ago"),
+            (90000, "idle", "25h ago"),
+        ]
+        for age, stale, rel in cases:
+            row = session._row(session.last_seen_ts + age)
+            self.assertEqual((row["staleness"], row["last_seen_relative"]), (stale, rel), age)
+            self.assertEqual(self.mod["staleness"](age), stale)
+            self.assertEqual(self.mod["relative_time"](age), rel)
+
+    def test_status_class_normalizes_status_text(self):
+        status_class = self.mod["status_class"]
+        self.assertEqual(status_class("Awaiting Approval"), "status-awaiting-approval")
+        self.assertEqual(status_class("RUNNING"), "status-running")
+        self.assertEqual(status_class("Done"), "status-done")
+        self.assertEqual(status_class(None), "status-done")
+
+    def test_sessions_json_bytes_cached_until_a_write(self):
+        get_bytes = self.mod["get_sessions_json_bytes"]
+        upsert = self.mod["upsert_session"]
+        upsert({"session_id": "s1", "name": "session-1", "task": "t1"})
+
+        first, first_etag, _ = get_bytes()
+        self.assertIs(get_bytes()[0], first)
+
+        upsert({"session_id": "s1", "task": "t2"})
+        second, second_etag, _ = get_bytes()
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second_etag, first_etag)
+        payload = json.loads(self.mod["stamp_timestamp"](second))
+        self.assertEqual(payload["sessions"][0]["task"], "t2")
+        self.assertIn("timestamp", payload)
+
+    def test_json_bytes_stdlib_fallback_is_compact(self):
+        original = self.globals["orjson"]
+        self.globals["orjson"] = None
+        try:
+            body = self.mod["_json_bytes"]({"ok": True, "items": [1, 2]})
+        finally:
+            self.globals["orjson"] = original
+        self.assertEqual(body, b'{"ok":true,"items":[1,2]}')
+
+    def test_gzip_body_finishes_cached_prefix_with_timestamp(self):
+        upsert = self.mod["upsert_session"]
+        for i in range(20):
+            upsert({"session_id": f"s{i}", "name": f"session-{i}", "task": "x" * 40})
+
+        body, _, gzip_state = self.mod["get_sessions_json_bytes"]()
+        self.assertIsNotNone(gzip_state)
+        for _ in range(2):  # the cached compressor is reusable
+            payload = json.loads(gzip.decompress(self.mod["finish_gzip"](gzip_state)))
+            self.assertIn("timestamp", payload)
+            self.assertEqual(len(payload["sessions"]), 20)
+
+        accepts_gzip = self.mod["_accepts_gzip"]
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, gzip;q=0.8"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("identity"))
+
+    def test_streamed_sessions_json_matches_full_document(self):
+        upsert = self.mod["upsert_session"]
+        for i in range(3):
+            upsert({"session_id": f"s{i}", "name": f"session-{i}", "task": f"t{i}"})
+        upsert({"session_id": "s1", "task": 'quote " caf\u00e9'})
+        upsert({"session_id": "s2", "task": ["not", "a", "string"], "risk": None})
+        upsert({"session_id": "t1", "parent_id": "s1", "name": "worker"})
+
+        expected = json.loads(json.dumps(self.mod["get_sessions_json"](1000.0)))
+
+        original = self.globals["orjson"]
+        for encoder in (original, None):
+            self.globals["orjson"] = encoder
+            try:
+                # chunk=1 forces one piece per row
+                pieces = list(self.mod["iter_sessions_json"](1000.0, chunk=1))
+            finally:
+                self.globals["orjson"] = original
+            self.assertEqual(len(pieces), 4)
+            self.assertEqual(json.loads(b"".join(pieces)), expected)
+
     def test_get_service_statuses_uses_configured_groups(self):
         dashboard = self.globals["DASHBOARD_UI_CONFIG"]
         statuspage_components = {}
@@ -233,6 +464,52 @@ class WorkstateDashboardTests(unittest.TestCase):
         finally:
             shutil.rmtree(tmpdir, ignore_errors=True)
 
+    def test_scanned_subagent_goes_idle_instead_of_expiring(self):
+        tmpdir = Path(__file__).resolve().parent / f"tmp-transcript-{uuid.uuid4().hex}"
+        project_dir = tmpdir / "C--Users-gmcmillan-Desktop-demo"
+        parent_uuid = str(uuid.uuid4())
+        subagents_dir = project_dir / parent_uuid / "subagents"
+        subagents_dir.mkdir(parents=True)
+        (project_dir / f"{parent_uuid}.jsonl").write_text("parent\n", encoding="utf-8")
+        agent = subagents_dir / "agent-work.jsonl"
+        agent.write_text("agent\n", encoding="utf-8")
+
+        try:
+            self.globals["CLAUDE_PROJECTS_DIR"] = tmpdir
+            self.globals["SYSTEM_BOOT_TIME"] = 0
+            self.globals["_count_claude_processes"] = lambda: 4
+            self.globals["_scan_wt_tabs"] = lambda: []
+            self.globals["_get_transcript_summary"] = lambda path: {
+                "first_user_message": "name",
+                "last_user_message": "task",
+                "slug": "",
+                "usage": {},
+            }
+            scan = self.mod["scan_claude_sessions"]
+            sweep = self.mod["sweep_expired"]
+            sid = self.globals["AUTO_PREFIX"] + parent_uuid
+
+            scan()
+            thread = self.globals["sessions"][sid].threads["agent-work"]
+            self.assertEqual(thread.status, "Running")
+            self.assertEqual(self.globals["_expiry_heap"], [])
+
+            # The subagent stops writing. The sweeper passing EXPIRE_SECONDS
+            # later must leave it to the scan, which then lists it as Idle.
+            sweep(time.time() + self.globals["EXPIRE_SECONDS"] + 1)
+            self.assertIn("agent-work", self.globals["sessions"][sid].threads)
+            idle_mtime = time.time() - 20 * 60
+            os.utime(agent, (idle_mtime, idle_mtime))
+            scan()
+            sweep(time.time())
+
+            threads = self.globals["sessions"][sid].threads
+            self.assertIs(threads["agent-work"], thread)
+            self.assertEqual(thread.status, "Idle")
+            self.assertEqual(self.globals["_expiry_heap"], [])
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
     def test_transcript_summary_cache_reuses_unchanged_file(self):
         lines = [
             json.dumps({"type": "user", "message": {"content": "first task"}}),
@@ -291,6 +568,149 @@ class WorkstateDashboardTests(unittest.TestCase):
         finally:
             shutil.rmtree(tmpdir, ignore_errors=True)
 
+    def _handle(self, raw):
+        """Run one request through DashboardHandler over in-memory streams."""
+        handler_cls = self.mod["DashboardHandler"]
+        handler = handler_cls.__new__(handler_cls)
+        handler.rfile = io.BytesIO(raw)
+        handler.wfile = io.BytesIO()
+        handler.client_address = ("127.0.0.1", 0)
+        handler.close_connection = True
+        handler.handle_one_request()
+        head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+        return int(head.split(b" ", 2)[1]), head, body, handler
+
+    def _post(self, headers, body=b""):
+        return self._handle(
+            b"POST /api/session HTTP/1.0\r\n" + b"".join(h + b"\r\n" for h in headers) + b"\r\n" + body
+        )
+
+    def test_post_session_accepts_curl_hook_request(self):
+        body = b'{"session_id": "hook", "name": "hook", "task": "Session started", "status": "Running"}'
+        # What `curl -H "Content-Type: application/json" -d ...` sends.
+        status, _, _, _ = self._post(
+            [
+                b"Host: localhost:7777",
+                b"User-Agent: curl/8.5.0",
+                b"Accept: */*",
+                b"Content-Type: application/json",
+                b"Content-Length: %d" % len(body),
+            ],
+            body,
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(self.globals["sessions"]["hook"].task, "Session started")
+
+        body = b'{"session_id": "hook", "task": "next"}'
+        status, _, _, _ = self._post(
+            [b"Content-Type: Application/JSON; charset=utf-8", b"Content-Length: %d" % len(body)], body
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(self.globals["sessions"]["hook"].task, "next")
+
+    def test_post_session_rejects_non_json_content_type(self):
+        body = b'{"session_id": "s1"}'
+        for content_type in (None, b"text/plain", b"application/x-www-form-urlencoded"):
+            headers = [b"Content-Length: %d" % len(body)]
+            if content_type:
+                headers.append(b"Content-Type: " + content_type)
+            status, _, resp, _ = self._post(headers, body)
+            self.assertEqual(status, 415, content_type)
+            self.assertIn(b"application/json", resp)
+        self.assertNotIn("s1", self.globals["sessions"])
+
+    def test_post_session_rejects_oversized_and_negative_lengths(self):
+        max_bytes = self.mod["MAX_POST_BYTES"]
+        status, _, resp, handler = self._post(
+            [b"Content-Type: application/json", b"Content-Length: %d" % (max_bytes + 1)],
+            b"x" * 16,
+        )
+        self.assertEqual(status, 413)
+        self.assertEqual(json.loads(resp), {"error": "Payload too large"})
+        # The oversized body must not have been read.
+        self.assertEqual(handler.rfile.read(), b"x" * 16)
+
+        status, _, resp, _ = self._post(
+            [b"Content-Type: application/json", b"Content-Length: -1"], b'{"session_id": "s1"}'
+        )
+        self.assertEqual(status, 400)
+        self.assertEqual(json.loads(resp), {"error": "Invalid JSON"})
+        self.assertNotIn("s1", self.globals["sessions"])
+
+    def test_large_session_list_is_streamed_until_close(self):
+        upsert = self.mod["upsert_session"]
+        for i in range(3):
+            upsert({"session_id": f"s{i}", "name": f"session-{i}"})
+        original = self.globals["SESSIONS_STREAM_MIN"]
+        self.globals["SESSIONS_STREAM_MIN"] = 2
+        try:
+            status, head, body, _ = self._handle(
+                b"GET /api/sessions HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            )
+        finally:
+            self.globals["SESSIONS_STREAM_MIN"] = original
+        self.assertEqual(status, 200)
+        self.assertIn(b"Connection: close", head)
+        self.assertNotIn(b"Content-Length", head)
+        self.assertNotIn(b"Transfer-Encoding", head)
+        self.assertEqual(len(json.loads(body)["sessions"]), 3)
+
+    def _start_server(self, workers):
+        server = self.mod["DashboardServer"](
+            ("127.0.0.1", 0), self.mod["DashboardHandler"], workers=workers
+        )
+        handle_error = server.handle_error
+
+        def quiet_handle_error(request, client_address):
+            # Clients these tests drop (or server_close() cuts off) are expected.
+            if not isinstance(sys.exc_info()[1], ConnectionError):
+                handle_error(request, client_address)
+
+        server.handle_error = quiet_handle_error
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_post_served_while_earlier_clients_keep_connections_open(self):
+        server = self._start_server(workers=2)
+        port = server.server_address[1]
+        idle = []
+        for _ in range(2):
+            sock = socket.create_connection(("127.0.0.1", port), timeout=3)
+            self.addCleanup(sock.close)
+            sock.sendall(b"GET /api/sessions HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            while sock.recv(65536):  # read the whole response
+                pass
+            idle.append(sock)
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=3)
+        self.addCleanup(conn.close)
+        conn.request(
+            "POST",
+            "/api/session",
+            body=json.dumps({"session_id": "s1", "name": "session-1"}),
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.read())["session_id"], "s1")
+
+    def test_server_close_releases_workers_waiting_on_clients(self):
+        server = self._start_server(workers=1)
+        stalled = socket.create_connection(("127.0.0.1", server.server_address[1]), timeout=3)
+        self.addCleanup(stalled.close)
+        stalled.sendall(b"GET /api/sessions HTTP/1.0\r\n")  # headers never finish
+        deadline = time.time() + 3
+        while not server._active and time.time() < deadline:
+            time.sleep(0.01)
+
+        server.shutdown()
+        started = time.monotonic()
+        server.server_close()
+        self.assertEqual(stalled.recv(1024), b"")  # closed, not timed out
+        self.assertLess(time.monotonic() - started, 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,7 +4,8 @@
 A tiny web server that multiple Claude Code sessions POST their status to.
 One browser tab shows everything at a glance: sessions, subagents, staleness.
 
-Zero dependencies - stdlib only.
+Zero dependencies - stdlib only. If orjson is installed it is used to encode
+JSON responses.
 
 Usage:
     python workstate-dashboard.py [--port PORT]
@@ -14,35 +15,76 @@ Dashboard: http://localhost:7777
 """
 
 import argparse
-import base64
+import collections
+import functools
+import hashlib
+import heapq
 import json
 import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http import HTTPStatus
+from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
+from types import MappingProxyType
+import socket
 import subprocess
 import urllib.error
 import urllib.request
-from urllib.parse import urlparse
 
 from workstate_dashboard_config import load_dashboard_config
 
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json otherwise
+    orjson = None
+
 # Hide console windows spawned by subprocess on Windows
 _NO_WINDOW = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, "CREATE_NO_WINDOW") else 0
 
 # Set at startup by --logo/--logo-left/--logo-right flags
-LOGO_DATA_URI = ""       # header logo (--logo)
-GUS_LOGO_URI = ""        # header right logo (gusai_logo.png)
-LOGO_LEFT_URI = ""       # bottom-left watermark (--logo-left)
+LOGO_URL = ""            # header logo (--logo)
+GUS_LOGO_URL = ""        # header right logo (gusai_logo.png)
+LOGO_LEFT_URL = ""       # bottom-left watermark (--logo-left)
+# Request path -> (headers, etag, body) for each loaded logo; filled by main().
+_LOGO_ASSETS = {}
+
+
+# json.dumps() builds a new JSONEncoder on every call once any option is
+# passed; the fallback path reuses a single configured instance instead.
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_json_str = json.encoder.encode_basestring_ascii
+
+
+def _json_bytes(data) -> bytes:
+    """Encode a response payload as UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return _JSON_ENCODER.encode(data).encode()
+
+
+def _json_loads(data: bytes):
+    """Decode a JSON request body; errors are ValueError subclasses either way."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_value(value) -> str:
+    """Encode a single field value as JSON text (plain strings skip the encoder)."""
+    if value.__class__ is str:
+        return _json_str(value)
+    return _JSON_ENCODER.encode(value)
 
 
 # ---------------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Thread:
     thread_id: str
     name: str
@@ -51,9 +93,11 @@ class Thread:
     risk: str
     started: str
     last_seen: str
+    started_ts: float = 0.0
+    last_seen_ts: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     session_id: str
     name: str
@@ -62,80 +106,254 @@ class Session:
     risk: str
     started: str
     last_seen: str
+    started_ts: float = 0.0
+    last_seen_ts: float = 0.0
     tab: str = ""
     usage: dict = field(default_factory=dict)
-    history: list = field(default_factory=list)
+    history: collections.deque = field(
+        default_factory=lambda: collections.deque(maxlen=MAX_HISTORY))
     threads: dict = field(default_factory=dict)  # thread_id -> Thread
 
 
+# CSS classes the dashboard uses for each status / staleness value.
+_STATUS_CLASS = MappingProxyType({
+    "running": "status-running",
+    "thinking": "status-thinking",
+    "idle": "status-idle",
+    "awaiting-approval": "status-awaiting-approval",
+    "up": "status-up",
+    "blocked": "status-blocked",
+    "failed": "status-failed",
+})
+_DOT_CLASS = {"ok": "dot-ok", "warning": "dot-warning", "idle": "dot-idle"}
+
+
+def status_class(status):
+    return _status_class(status if isinstance(status, str) else str(status or ""))
+
+
+# Clients report a handful of distinct status strings, so the case-folding
+# and whitespace normalization is done once per string, not once per row.
+# Bounded because the status text comes straight from POST bodies.
+@functools.lru_cache(maxsize=128)
+def _status_class(status):
+    return _STATUS_CLASS.get("-".join(status.lower().split()), "status-done")
+
+
+# JSON row builders are generated once per class: a straight-line dict literal
+# is noticeably cheaper per record than walking fields at poll time. Rows also
+# carry the CSS classes the dashboard applies directly. A second builder emits
+# the same row as JSON text in one f-string, skipping the dict altogether.
+_ROW_STALENESS = '"ok" if age < WARN_SECONDS else "warning" if age < STALE_SECONDS else "idle"'
+_ROW_RELATIVE = (
+    '_REL_SECONDS[int(age)] if age < 60 else '
+    '_REL_MINUTES[int(age // 60)] if age < 3600 else _rel_hours(int(age // 3600))'
+)
+
+
+def _compile_row_builder(cls, columns, extra=()):
+    """Attach ``cls._row(self, now_ts)`` and ``cls._row_json(self, now_ts)``.
+
+    ``_row`` returns the record's JSON row as a dict; ``_row_json`` returns
+    the same row already encoded as JSON text. ``columns`` are attributes
+    copied as-is; ``extra`` is ``(key, expression, json_expression)`` triples
+    evaluated in the generated functions (``self``, ``age``, ``now_ts``), the
+    last one producing encoded JSON text.
+    """
+    # Derived values are CSS class names and "Ns ago" labels: plain ASCII
+    # with nothing to escape, so the JSON builder quotes them directly.
+    derived = [
+        ("staleness", "stale"),
+        ("dot_class", "_DOT_CLASS[stale]"),
+        ("status_class", "status_class(self.status)"),
+        ("last_seen_relative", "rel"),
+    ]
+    items = [(name, f"self.{name}") for name in columns] + derived
+    items += [(key, expr) for key, expr, _ in extra]
+    body = "".join(f"        {key!r}: {expr},\n" for key, expr in items)
+    fields = [f'"{name}":{{_json_value(self.{name})}}' for name in columns]
+    fields += [f'"{key}":"{{{expr}}}"' for key, expr in derived]
+    fields += [f'"{key}":{{{json_expr}}}' for key, _, json_expr in extra]
+    text = "{{" + ",".join(fields) + "}}"
+    prologue = (
+        "    age = max(now_ts - self.last_seen_ts, 0.0)\n"
+        f"    stale = {_ROW_STALENESS}\n"
+        f"    rel = {_ROW_RELATIVE}\n"
+    )
+    src = (
+        "def _row(self, now_ts):\n"
+        f"{prologue}"
+        "    return {\n"
+        f"{body}"
+        "    }\n"
+        "\n"
+        "def _row_json(self, now_ts):\n"
+        f"{prologue}"
+        f"    return f'{text}'\n"
+    )
+    namespace = {}
+    exec(src, globals(), namespace)
+    cls._row = namespace["_row"]
+    cls._row_json = namespace["_row_json"]
+
+
+_compile_row_builder(
+    Thread,
+    ("thread_id", "name", "task", "status", "risk", "started", "last_seen"),
+)
+_compile_row_builder(
+    Session,
+    ("session_id", "name", "task", "status", "risk", "tab", "usage", "started", "last_seen"),
+    extra=(
+        ("history", "list(self.history)", "_json_value(list(self.history))"),
+        (
+            "threads",
+            "[t._row(now_ts) for t in sorted(self.threads.values(), key=_sort_key)]",
+            '"[" + ",".join([t._row_json(now_ts) for t in '
+            'sorted(self.threads.values(), key=_sort_key)]) + "]"',
+        ),
+    ),
+)
+
+
 # ---------------------------------------------------------------------------
 # In-memory store
 # ---------------------------------------------------------------------------
 
+# Readers never take the lock. Writers hold it, build a new dict/list for any
+# container they change and rebind the global (or attribute), so a published
+# container is never mutated in place. Scalar fields on a record are updated
+# in place; single attribute stores are atomic. `expired` and each session's
+# `history` are the exception: bounded deques appended in place (deque appends
+# are thread-safe) that readers copy with list() before looking at them.
+MAX_EXPIRED = 10
 sessions: dict[str, Session] = {}
-expired: list[dict] = []
-lock = threading.Lock()
+expired: collections.deque = collections.deque(maxlen=MAX_EXPIRED)
+lock = threading.Lock()  # serializes writers
+
+# Min-heap of (expiry_ts, session_id, thread_id), one entry per armed thread.
+# Entries are checked lazily: a thread seen again since it was armed is
+# re-armed at its new expiry when its entry reaches the top.
+_expiry_heap: list[tuple[float, str, str]] = []
+_expiry_armed: set[tuple[str, str]] = set()
+# The sweeper sleeps on this until the next deadline; writers notify it when
+# they arm a deadline earlier than the one it is waiting for.
+_sweep_wakeup = threading.Condition(lock)
 
 MAX_HISTORY = 5
 WARN_SECONDS = 60
 STALE_SECONDS = 180
 EXPIRE_SECONDS = 600
 PURGE_SECONDS = 300
+SESSIONS_CACHE_TTL = 1.0  # seconds a serialized /api/sessions body may be reused
+SESSIONS_STREAM_MIN = 500  # above this many sessions /api/sessions is streamed
+_STREAM_CHUNK = 64 * 1024  # target bytes per write when streaming
+GZIP_MIN_BYTES = 1024  # smaller /api/sessions bodies are sent uncompressed
 
+# Serialized /api/sessions body (without its timestamp) and ETag, stored
+# together as one tuple. Writers set "dirty"; otherwise the entry is reused
+# until the TTL lapses (relative times only move once a second).
+_sessions_json_cache = {"entry": None, "ts": 0, "dirty": True}
+# Held only while rebuilding the entry, so concurrent pollers that miss at
+# the same moment wait for one build instead of each doing their own.
+# Writers never take it.
+_sessions_json_build_lock = threading.Lock()
 
-def now_iso():
-    return datetime.now(timezone.utc).isoformat()
 
+_UTC = timezone.utc
 
-def seconds_since(iso_str):
-    try:
-        dt = datetime.fromisoformat(iso_str)
-        return (datetime.now(timezone.utc) - dt).total_seconds()
-    except Exception:
-        return 99999
 
+def now_iso(ts=None):
+    """ISO-8601 UTC string for ``ts`` (default now); only for display fields."""
+    if ts is None:
+        ts = time.time()
+    return datetime.fromtimestamp(ts, _UTC).isoformat()
 
-def staleness(last_seen):
-    age = seconds_since(last_seen)
-    if age < WARN_SECONDS:
-        return "ok"
-    elif age < STALE_SECONDS:
-        return "warning"
-    else:
-        # Sessions stay visible as "idle" — they never auto-expire.
-        # Only explicit Done/Delete removes a session.
-        return "idle"
 
+def _touch(record, ts=None):
+    """Stamp a Thread/Session as seen now (or at epoch ``ts``).
+
+    The float is what staleness math uses; the ISO string is kept for JSON.
+    """
+    if ts is None:
+        ts = time.time()
+    record.last_seen_ts = ts
+    record.last_seen = now_iso(ts)
 
-def relative_time(iso_str):
-    age = seconds_since(iso_str)
-    if age < 60:
-        return f"{int(age)}s ago"
-    elif age < 3600:
-        return f"{int(age // 60)}m ago"
-    else:
-        return f"{int(age // 3600)}h ago"
-
-
-def _status_rank(status: str) -> int:
-    ranks = {
-        "Failed": 0,
-        "Blocked": 1,
-        "Awaiting Approval": 2,
-        "Running": 3,
-        "Thinking": 3,
-        "Up": 3,
-        "Idle": 4,
-        "Done": 5,
-    }
-    return ranks.get(status or "", 6)
+
+def _compile_age_function(name, expr):
+    """Build ``name(age)`` returning ``expr``, one of the ``_ROW_*`` expressions.
+
+    The row builders inline the same expressions, so both share one
+    definition. ``age`` is clamped at zero as in the row prologue.
+    """
+    namespace = {}
+    exec(f"def {name}(age):\n    age = max(age, 0.0)\n    return {expr}\n", globals(), namespace)
+    return namespace[name]
+
+
+# Sessions stay visible as "idle" — they never auto-expire.
+# Only explicit Done/Delete removes a session.
+staleness = _compile_age_function("staleness", _ROW_STALENESS)
+
+
+# Preformatted "Ns ago" / "Nm ago" strings, indexed by whole seconds/minutes.
+_REL_SECONDS = tuple(f"{i}s ago" for i in range(60))
+_REL_MINUTES = tuple(f"{i}m ago" for i in range(60))
+
+
+# Past the first hour the label changes only hourly; cache those as they come.
+@functools.lru_cache(maxsize=256)
+def _rel_hours(hours):
+    return f"{hours}h ago"
+
+
+relative_time = _compile_age_function("relative_time", _ROW_RELATIVE)
+
+
+_STATUS_RANK = MappingProxyType({
+    "Failed": 0,
+    "Blocked": 1,
+    "Awaiting Approval": 2,
+    "Running": 3,
+    "Thinking": 3,
+    "Up": 3,
+    "Idle": 4,
+    "Done": 5,
+})
+
+
+def _sort_key(record, _rank=_STATUS_RANK.get):
+    """Order by status urgency, then most recently seen first."""
+    return (_rank(record.status or "", 6), -record.last_seen_ts)
 
 
 # ---------------------------------------------------------------------------
 # Session management
 # ---------------------------------------------------------------------------
 
+def _arm_expiry(sid, t):
+    """Schedule thread expiry; caller holds ``lock``."""
+    key = (sid, t.thread_id)
+    if key not in _expiry_armed:
+        _expiry_armed.add(key)
+        entry = (t.last_seen_ts + EXPIRE_SECONDS, sid, t.thread_id)
+        heapq.heappush(_expiry_heap, entry)
+        if _expiry_heap[0] is entry:
+            _sweep_wakeup.notify()
+
+
+def _expired_entry(s, now_ts):
+    return {
+        "name": s.name,
+        "last_task": s.task,
+        "expired_at": now_iso(now_ts),
+        "expired_ts": now_ts,
+    }
+
+
 def upsert_session(data):
+    global sessions
     sid = data.get("session_id")
     if not sid:
         return {"error": "Missing required field: session_id"}, 400
@@ -143,19 +361,26 @@ def upsert_session(data):
     parent_id = data.get("parent_id")
 
     with lock:
+        # One clock read per request; every timestamp below derives from it.
+        now_ts = time.time()
+        heartbeat = now_iso(now_ts)
         # Thread update (child of a session)
         if parent_id and parent_id in sessions:
             parent = sessions[parent_id]
             tid = data.get("thread_id", sid)
-            heartbeat = now_iso()
-            if tid in parent.threads:
-                t = parent.threads[tid]
+            t = parent.threads.get(tid)
+            if t is not None:
                 t.task = data.get("task", t.task)
                 t.status = data.get("status", t.status)
                 t.risk = data.get("risk", t.risk)
-                t.last_seen = heartbeat
-            else:
-                parent.threads[tid] = Thread(
+                _touch(t, now_ts)
+                # Clean up the thread once it reports Done
+                if t.status == "Done":
+                    threads = dict(parent.threads)
+                    del threads[tid]
+                    parent.threads = threads
+            elif data.get("status", "Running") != "Done":
+                t = Thread(
                     thread_id=tid,
                     name=data.get("name", tid),
                     task=data.get("task", ""),
@@ -163,157 +388,298 @@ def upsert_session(data):
                     risk=data.get("risk", "-"),
                     started=heartbeat,
                     last_seen=heartbeat,
+                    started_ts=now_ts,
+                    last_seen_ts=now_ts,
                 )
-            parent.last_seen = heartbeat
-            # Clean up done threads
-            done = [k for k, v in parent.threads.items() if v.status == "Done"]
-            for k in done:
-                del parent.threads[k]
+                parent.threads = {**parent.threads, tid: t}
+                _arm_expiry(parent_id, t)
+            _touch(parent, now_ts)
+            _sessions_json_cache["dirty"] = True
             return {"ok": True, "session_id": parent_id, "thread_id": tid,
                     "active_sessions": len(sessions)}, 200
 
         # Session update
-        if sid in sessions:
-            s = sessions[sid]
+        s = sessions.get(sid)
+        if s is not None:
             new_task = data.get("task", s.task)
             if new_task != s.task:
                 s.history.append(s.task)
-                if len(s.history) > MAX_HISTORY:
-                    s.history = s.history[-MAX_HISTORY:]
             s.task = new_task
             s.status = data.get("status", s.status)
             s.risk = data.get("risk", s.risk)
-            s.last_seen = now_iso()
+            _touch(s, now_ts)
+            if s.status != "Done":
+                # The common case (heartbeats, task changes): only fields on
+                # the record changed, so the published dict is left alone
+                # rather than copied.
+                _sessions_json_cache["dirty"] = True
+                return {"ok": True, "session_id": sid, "name": s.name,
+                        "active_sessions": len(sessions)}, 200
+            current = dict(sessions)
         else:
-            sessions[sid] = Session(
+            current = dict(sessions)
+            current[sid] = Session(
                 session_id=sid,
-                name=data.get("name", f"session-{len(sessions) + 1}"),
+                name=data.get("name", f"session-{len(current) + 1}"),
                 task=data.get("task", "Session started"),
                 status=data.get("status", "Running"),
                 risk=data.get("risk", "-"),
-                started=now_iso(),
-                last_seen=now_iso(),
+                started=heartbeat,
+                last_seen=heartbeat,
+                started_ts=now_ts,
+                last_seen_ts=now_ts,
             )
 
         # Remove session if Done
-        if sessions.get(sid) and sessions[sid].status == "Done":
-            s = sessions.pop(sid)
-            expired.append({
-                "name": s.name,
-                "last_task": s.task,
-                "expired_at": now_iso(),
-            })
+        if current[sid].status == "Done":
+            expired.append(_expired_entry(current.pop(sid), now_ts))
+        sessions = current
+        _sessions_json_cache["dirty"] = True
 
         return {"ok": True, "session_id": sid,
-                "name": sessions[sid].name if sid in sessions else data.get("name", ""),
-                "active_sessions": len(sessions)}, 200
+                "name": current[sid].name if sid in current else data.get("name", ""),
+                "active_sessions": len(current)}, 200
 
 
 def delete_session(sid):
+    global sessions
     with lock:
         if sid in sessions:
-            s = sessions.pop(sid)
-            expired.append({
-                "name": s.name,
-                "last_task": s.task,
-                "expired_at": now_iso(),
-            })
+            current = dict(sessions)
+            expired.append(_expired_entry(current.pop(sid), time.time()))
+            sessions = current
+            _sessions_json_cache["dirty"] = True
             return {"ok": True, "removed": sid}, 200
         return {"error": "Session not found"}, 404
 
 
-def get_sessions_json():
-    with lock:
-        result = []
-        for s in sessions.values():
-            threads = []
-            for t in s.threads.values():
-                threads.append({
-                    "thread_id": t.thread_id,
-                    "name": t.name,
-                    "task": t.task,
-                    "status": t.status,
-                    "risk": t.risk,
-                    "started": t.started,
-                    "last_seen": t.last_seen,
-                    "staleness": staleness(t.last_seen),
-                    "last_seen_relative": relative_time(t.last_seen),
-                })
-            threads.sort(key=lambda t: (_status_rank(t["status"]), seconds_since(t["last_seen"])))
-            result.append({
-                "session_id": s.session_id,
-                "name": s.name,
-                "task": s.task,
-                "status": s.status,
-                "risk": s.risk,
-                "tab": s.tab,
-                "usage": s.usage,
-                "started": s.started,
-                "last_seen": s.last_seen,
-                "staleness": staleness(s.last_seen),
-                "last_seen_relative": relative_time(s.last_seen),
-                "history": list(s.history),
-                "threads": threads,
-            })
-        result.sort(key=lambda s: (_status_rank(s["status"]), seconds_since(s["last_seen"])))
-
-        total_threads = sum(len(s.threads) for s in sessions.values())
-        # Aggregate usage across all sessions
-        agg_usage = {"input_tokens": 0, "output_tokens": 0,
-                     "cache_write_tokens": 0, "cache_read_tokens": 0, "cost_usd": 0.0}
-        for s in sessions.values():
-            for k in agg_usage:
-                agg_usage[k] += s.usage.get(k, 0)
-        agg_usage["cost_usd"] = round(agg_usage["cost_usd"], 4)
-
-        sys_stats = _system_stats_cache["data"]
-        railway_stats = _railway_cache["data"]
-        elevenlabs_stats = _elevenlabs_cache["data"]
-        service_stats = _service_status_cache["data"]
+def get_sessions_json(now_ts=None):
+    # Lock-free read: bind the published snapshots once and work from those.
+    # A single clock tick serves every age computation and the envelope
+    # timestamp, so rows in one payload are consistent with each other.
+    current = sessions
+    if now_ts is None:
+        now_ts = time.time()
+    ordered = sorted(current.values(), key=_sort_key)
+    return {
+        "sessions": [s._row(now_ts) for s in ordered],
+        **_sessions_envelope(ordered, now_ts),
+    }
 
-        return {
-            "sessions": result,
-            "expired": list(expired[-10:]),
-            "counts": {
-                "sessions": len(sessions),
-                "threads": total_threads,
-            },
-            "usage": agg_usage,
-            "system": sys_stats,
-            "railway": railway_stats,
-            "elevenlabs": elevenlabs_stats,
-            "services": service_stats,
-            "dashboard": DASHBOARD_UI_CONFIG,
-            "timestamp": now_iso(),
-        }
+
+def iter_sessions_json(now_ts=None, timestamp=True, chunk=_STREAM_CHUNK):
+    """Yield the /api/sessions body in pieces of roughly ``chunk`` bytes.
+
+    Produces the same document as get_sessions_json(), but encodes one row
+    at a time so (when streaming) the whole body never exists at once.
+    ``timestamp=False`` leaves out the envelope timestamp.
+    """
+    current = sessions
+    if now_ts is None:
+        now_ts = time.time()
+    ordered = sorted(current.values(), key=_sort_key)
+    if orjson is not None:
+        rows = (orjson.dumps(s._row(now_ts)) for s in ordered)
+    else:
+        # Without orjson, emitting JSON text directly beats building row
+        # dicts for the stdlib encoder to walk.
+        rows = (s._row_json(now_ts).encode() for s in ordered)
+    buf = [b'{"sessions":[']
+    size = 0
+    for i, row in enumerate(rows):
+        buf.append(b"," + row if i else row)
+        size += len(row)
+        if size >= chunk:
+            yield b"".join(buf)
+            buf = []
+            size = 0
+    envelope = _sessions_envelope(ordered, now_ts)
+    if not timestamp:
+        del envelope["timestamp"]
+    # The envelope is a non-empty object; splice its members after the list.
+    buf.append(b"]," + _json_bytes(envelope)[1:])
+    yield b"".join(buf)
+
+
+def _sessions_envelope(ordered, now_ts):
+    """Everything in the /api/sessions document except the session rows."""
+    # Newest first. Entries age out after PURGE_SECONDS; the sweeper may not
+    # have popped them yet, so stop at the first one that is already stale.
+    recent_expired = []
+    for e in reversed(list(expired)):
+        if now_ts - e["expired_ts"] >= PURGE_SECONDS:
+            break
+        recent_expired.append(e)
+
+    total_threads = sum(len(s.threads) for s in ordered)
+    # Aggregate usage across all sessions
+    agg_usage = {"input_tokens": 0, "output_tokens": 0,
+                 "cache_write_tokens": 0, "cache_read_tokens": 0, "cost_usd": 0.0}
+    for s in ordered:
+        for k in agg_usage:
+            agg_usage[k] += s.usage.get(k, 0)
+    agg_usage["cost_usd"] = round(agg_usage["cost_usd"], 4)
+
+    sys_stats = _system_stats_cache["data"]
+    railway_stats = _railway_cache["data"]
+    elevenlabs_stats = _elevenlabs_cache["data"]
+    service_stats = _service_status_cache["data"]
+
+    return {
+        "expired": recent_expired,
+        "counts": {
+            "sessions": len(ordered),
+            "threads": total_threads,
+        },
+        "usage": agg_usage,
+        "system": sys_stats,
+        "railway": railway_stats,
+        "elevenlabs": elevenlabs_stats,
+        "services": service_stats,
+        "dashboard": DASHBOARD_UI_CONFIG,
+        "timestamp": now_iso(now_ts),
+    }
+
+
+def get_sessions_json_bytes():
+    """Return ``(body, etag, gzip_state)`` for /api/sessions, reusing the cached entry if still valid.
+
+    The body leaves out the envelope timestamp so that an unchanged payload
+    keeps its ETag; add it with stamp_timestamp() before sending, or with
+    finish_gzip() for the compressed form. ``gzip_state`` is None for bodies
+    too small to be worth compressing.
+    """
+    cache = _sessions_json_cache
+    # The TTL runs on the monotonic clock so a wall-clock step (NTP, resume
+    # from sleep) can neither pin a stale body nor defeat the cache.
+    tick = time.monotonic()
+    entry = cache["entry"]
+    if entry is not None and not cache["dirty"] and tick - cache["ts"] < SESSIONS_CACHE_TTL:
+        return entry
+    with _sessions_json_build_lock:
+        # Another poller may have rebuilt it while this one waited.
+        entry = cache["entry"]
+        if entry is not None and not cache["dirty"] and tick <= cache["ts"]:
+            return entry
+        tick = time.monotonic()
+        # Clear before building so a write that lands mid-build dirties it again.
+        cache["dirty"] = False
+        body = b"".join(iter_sessions_json(timestamp=False, chunk=float("inf")))
+        gzip_state = _gzip_prefix(body) if len(body) >= GZIP_MIN_BYTES else None
+        entry = (body, b'W/"%08x"' % zlib.adler32(body), gzip_state)
+        cache["entry"] = entry
+        cache["ts"] = tick
+        return entry
+
+
+def _timestamp_tail():
+    return b',"timestamp":"' + now_iso().encode() + b'"}'
+
+
+def stamp_timestamp(body):
+    """Append the current ``timestamp`` key to an encoded JSON object."""
+    return body[:-1] + _timestamp_tail()
+
+
+def _gzip_prefix(body):
+    """Compress ``body`` up to its closing brace, once per cached entry.
+
+    Returns the gzip bytes so far and the compressor that produced them;
+    finish_gzip() continues a copy of it with the per-response timestamp,
+    so each poll only compresses a few dozen bytes.
+    """
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    head = compressor.compress(body[:-1]) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return head, compressor
+
+
+def finish_gzip(gzip_state):
+    """Complete a cached gzip prefix with the current timestamp."""
+    head, compressor = gzip_state
+    compressor = compressor.copy()
+    return head + compressor.compress(_timestamp_tail()) + compressor.flush()
+
+
+@functools.lru_cache(maxsize=32)
+def _accepts_gzip(accept_encoding):
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() == "gzip":
+            name, _, qvalue = params.partition("=")
+            if name.strip() != "q":
+                return True
+            try:
+                return float(qvalue) > 0
+            except ValueError:
+                return False
+    return False
 
 
 # ---------------------------------------------------------------------------
 # Expiry sweeper
 # ---------------------------------------------------------------------------
 
+def sweep_expired(now_ts=None):
+    """Drop threads that have not been seen for EXPIRE_SECONDS."""
+    if now_ts is None:
+        now_ts = time.time()
+    # Most ticks have nothing due; peek without the lock (re-checked below).
+    heap_due = bool(_expiry_heap) and _expiry_heap[0][0] < now_ts
+    purge_due = bool(expired) and now_ts - expired[0]["expired_ts"] >= PURGE_SECONDS
+    if not heap_due and not purge_due:
+        return
+    with lock:
+        # Expired entries are appended in time order, so aged-out ones are at
+        # the left end.
+        while expired and now_ts - expired[0]["expired_ts"] >= PURGE_SECONDS:
+            expired.popleft()
+        # Threads (subagents) auto-expire after EXPIRE_SECONDS
+        due = {}  # sid -> thread ids to drop
+        while _expiry_heap and _expiry_heap[0][0] < now_ts:
+            _, sid, tid = heapq.heappop(_expiry_heap)
+            s = sessions.get(sid)
+            t = s.threads.get(tid) if s else None
+            if t is None:
+                _expiry_armed.discard((sid, tid))
+            elif t.last_seen_ts + EXPIRE_SECONDS >= now_ts:
+                heapq.heappush(_expiry_heap, (t.last_seen_ts + EXPIRE_SECONDS, sid, tid))
+            else:
+                _expiry_armed.discard((sid, tid))
+                due.setdefault(sid, set()).add(tid)
+        for sid, tids in due.items():
+            s = sessions[sid]
+            threads = dict(s.threads)
+            for tid in tids:
+                del threads[tid]
+            s.threads = threads
+        if due:
+            _sessions_json_cache["dirty"] = True
+
+
+def _next_sweep_delay(now_ts):
+    """Seconds until the sweeper has something to do, at most PURGE_SECONDS."""
+    due = now_ts + PURGE_SECONDS
+    if _expiry_heap:
+        due = min(due, _expiry_heap[0][0])
+    if expired:
+        due = min(due, expired[0]["expired_ts"] + PURGE_SECONDS)
+    return max(due - now_ts, 0.0)
+
+
 def sweeper():
+    """Sleep until the next thread expiry or purge is due, then sweep.
+
+    Heap entries are lazy, so a wakeup may find the thread was seen since and
+    only re-arm it. The PURGE_SECONDS cap covers expired entries appended
+    while the sweeper was already waiting.
+    """
     while True:
         try:
-            time.sleep(30)
-            with lock:
-                # Threads (subagents) auto-expire after EXPIRE_SECONDS
-                for sid, s in sessions.items():
-                    to_remove = []
-                    for tid, t in s.threads.items():
-                        if seconds_since(t.last_seen) > EXPIRE_SECONDS:
-                            to_remove.append(tid)
-                    for tid in to_remove:
-                        del s.threads[tid]
-
-                # Purge old expired entries after PURGE_SECONDS
-                cutoff = PURGE_SECONDS
-                expired[:] = [
-                    e for e in expired
-                    if seconds_since(e.get("expired_at", now_iso())) < cutoff
-                ]
+            with _sweep_wakeup:
+                _sweep_wakeup.wait(_next_sweep_delay(time.time()))
+            sweep_expired()
         except Exception:
-            pass  # never let the sweeper die
+            time.sleep(1)  # never let the sweeper die, nor spin
 
 
 # ---------------------------------------------------------------------------
@@ -615,7 +981,7 @@ def _get_railway_stats() -> dict:
         "Project-Access-Token": RAILWAY_TOKEN,
         "User-Agent": "workstate-dashboard/1.0",
     }
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%dT00:00:00Z")
+    today = datetime.now(_UTC).strftime("%Y-%m-%dT00:00:00Z")
     try:
         # Build a single query for both services + estimated usage
         parts = []
@@ -937,6 +1303,7 @@ def _scan_wt_tabs():
 
 def scan_claude_sessions():
     """Scan ~/.claude/projects/ for active Claude Code sessions."""
+    global sessions
     if not CLAUDE_PROJECTS_DIR.exists():
         return
 
@@ -985,7 +1352,7 @@ def scan_claude_sessions():
                         "risk": "-",
                         "tab": tab_label,
                         "usage": usage,
-                        "mtime_iso": datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat(),
+                        "mtime": mtime,
                     }
                 except Exception:
                     continue
@@ -1017,7 +1384,6 @@ def scan_claude_sessions():
                         thread_name = slug if slug else agent_id
                         task = summary["last_user_message"]
                         status = "Running" if age < ACTIVE_THRESHOLD_SEC else "Idle"
-                        mtime_iso = datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat()
 
                         if parent_sid not in detected_threads:
                             detected_threads[parent_sid] = {}
@@ -1027,7 +1393,7 @@ def scan_claude_sessions():
                             "task": task,
                             "status": status,
                             "risk": "-",
-                            "mtime_iso": mtime_iso,
+                            "mtime": mtime,
                         }
                     except Exception:
                         continue
@@ -1086,84 +1452,93 @@ def scan_claude_sessions():
                 matched.append(item)
             else:
                 unmatched.append(item)
-        matched.sort(key=lambda kv: kv[1].get("mtime_iso", ""), reverse=True)
-        unmatched.sort(key=lambda kv: kv[1].get("mtime_iso", ""), reverse=True)
+        matched.sort(key=lambda kv: kv[1]["mtime"], reverse=True)
+        unmatched.sort(key=lambda kv: kv[1]["mtime"], reverse=True)
         detected = dict((matched + unmatched)[:max(n_procs, 0)])
 
     with lock:
+        current = dict(sessions)
         # Update or create auto-detected sessions
         for sid, info in detected.items():
-            if sid in sessions:
-                s = sessions[sid]
+            if sid in current:
+                s = current[sid]
                 new_task = info["task"]
                 if new_task != s.task:
                     s.history.append(s.task)
-                    if len(s.history) > MAX_HISTORY:
-                        s.history = s.history[-MAX_HISTORY:]
                 s.task = new_task
                 s.status = info["status"]
                 s.tab = info.get("tab", s.tab)
                 s.usage = info.get("usage", {})
-                s.last_seen = info["mtime_iso"]
+                _touch(s, info["mtime"])
             else:
-                sessions[sid] = Session(
+                mtime_iso = now_iso(info["mtime"])
+                current[sid] = Session(
                     session_id=sid,
                     name=info["name"],
                     task=info["task"],
                     status=info["status"],
                     risk=info["risk"],
-                    started=info["mtime_iso"],
-                    last_seen=info["mtime_iso"],
+                    started=mtime_iso,
+                    last_seen=mtime_iso,
+                    started_ts=info["mtime"],
+                    last_seen_ts=info["mtime"],
                     tab=info.get("tab", ""),
                     usage=info.get("usage", {}),
                 )
 
         # Apply detected subagent threads to their parent sessions
         for parent_sid, threads in detected_threads.items():
-            if parent_sid not in sessions:
+            if parent_sid not in current:
                 continue
-            parent = sessions[parent_sid]
+            parent = current[parent_sid]
+            parent_threads = dict(parent.threads)
             for tid, tinfo in threads.items():
-                if tid in parent.threads:
-                    t = parent.threads[tid]
+                if tid in parent_threads:
+                    t = parent_threads[tid]
                     t.task = tinfo["task"]
                     t.status = tinfo["status"]
-                    t.last_seen = tinfo["mtime_iso"]
+                    _touch(t, tinfo["mtime"])
                 else:
-                    parent.threads[tid] = Thread(
+                    mtime_iso = now_iso(tinfo["mtime"])
+                    parent_threads[tid] = Thread(
                         thread_id=tid,
                         name=tinfo["name"],
                         task=tinfo["task"],
                         status=tinfo["status"],
                         risk=tinfo["risk"],
-                        started=tinfo["mtime_iso"],
-                        last_seen=tinfo["mtime_iso"],
+                        started=mtime_iso,
+                        last_seen=mtime_iso,
+                        started_ts=tinfo["mtime"],
+                        last_seen_ts=tinfo["mtime"],
                     )
+                    # Not armed for expiry: the scan owns these threads, listing
+                    # them as Idle up to IDLE_THRESHOLD_SEC and dropping them
+                    # itself once their transcript is gone.
             # Remove auto-detected threads no longer in this scan
             auto_tids = set(threads.keys())
-            stale = [t for t in parent.threads if t.startswith("agent-") and t not in auto_tids]
+            stale = [t for t in parent_threads if t.startswith("agent-") and t not in auto_tids]
             for t in stale:
-                del parent.threads[t]
+                del parent_threads[t]
+            parent.threads = parent_threads
 
         # Clean up subagent threads from sessions with no detected subagents
-        for sid in sessions:
+        for sid, s in current.items():
             if sid.startswith(AUTO_PREFIX) and sid not in detected_threads:
-                stale = [t for t in sessions[sid].threads if t.startswith("agent-")]
-                for t in stale:
-                    del sessions[sid].threads[t]
+                if any(t.startswith("agent-") for t in s.threads):
+                    s.threads = {
+                        tid: t for tid, t in s.threads.items() if not tid.startswith("agent-")
+                    }
 
         # Remove auto-detected sessions that are no longer active
         to_remove = []
-        for sid in sessions:
+        for sid in current:
             if sid.startswith(AUTO_PREFIX) and sid not in detected:
                 to_remove.append(sid)
+        removed_ts = time.time()
         for sid in to_remove:
-            s = sessions.pop(sid)
-            expired.append({
-                "name": s.name,
-                "last_task": s.task,
-                "expired_at": now_iso(),
-            })
+            expired.append(_expired_entry(current.pop(sid), removed_ts))
+        sessions = current
+        _sessions_json_cache["dirty"] = True
 
 
 def session_scanner():
@@ -1202,86 +1577,235 @@ def cache_refresher():
 # HTTP handler
 # ---------------------------------------------------------------------------
 
+# Header blocks are prebuilt and written verbatim with the status line and
+# body in a single write, instead of formatting them via send_header().
+_CORS_HEADERS = (
+    b"Access-Control-Allow-Origin: http://localhost:7777\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type\r\n"
+)
+_JSON_HEADERS = b"Content-Type: application/json\r\n" + _CORS_HEADERS
+# no-cache: the browser may keep the body but must revalidate it via ETag.
+_SESSIONS_HEADERS = _JSON_HEADERS + b"Cache-Control: no-cache\r\nVary: Accept-Encoding\r\n"
+_SESSIONS_GZIP_HEADERS = _SESSIONS_HEADERS + b"Content-Encoding: gzip\r\n"
+# The page only changes when the server restarts, so browsers keep it and
+# revalidate by ETag; no-cache rather than max-age so a restart with new
+# logos or template shows up on the next load.
+_HTML_HEADERS = b"Content-Type: text/html; charset=utf-8\r\nCache-Control: no-cache\r\n"
+_NOT_FOUND = _json_bytes({"error": "Not found"})
+# Session updates are a few hundred bytes; anything near this is not one.
+MAX_POST_BYTES = 64 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _status_line(protocol_version, code):
+    return f"{protocol_version} {code} {HTTPStatus(code).phrase}\r\n".encode("latin-1")
+
+
+def _route_path(raw):
+    """Return the request target without its query string.
+
+    Routing only needs exact and prefix matches on the path, so slicing at
+    ``?`` is enough; urlparse() would build a full ParseResult per request.
+    """
+    qmark = raw.find("?")
+    return raw if qmark < 0 else raw[:qmark]
+
+
 class DashboardHandler(BaseHTTPRequestHandler):
+    # Stays on HTTP/1.0 (one request per connection): connections are served
+    # from a fixed worker pool, and an idle keep-alive connection would hold a
+    # worker until it timed out, starving hook POSTs. Responses are single
+    # small writes, so Nagle's delay would only add latency.
+    disable_nagle_algorithm = True
+    # Bounds how long a client that connects but stalls can hold a worker.
+    timeout = 5
 
     def do_GET(self):
-        path = urlparse(self.path).path
-        if path == "/":
-            self._serve_html()
-        elif path == "/api/sessions":
-            self._json_response(get_sessions_json(), 200)
-        elif path == "/api/launch-pwsh":
-            try:
-                subprocess.Popen(["wt", "new-tab", "pwsh"], creationflags=_NO_WINDOW)
-                self._json_response({"ok": True}, 200)
-            except Exception as e:
-                self._json_response({"error": str(e)}, 500)
+        path = _route_path(self.path)
+        route = self._GET_ROUTES.get(path)
+        if route is not None:
+            route(self)
+        elif path in _LOGO_ASSETS:
+            self._serve_logo(path)
         else:
-            self._json_response({"error": "Not found"}, 404)
+            self._send_json_bytes(_NOT_FOUND, 404)
 
     def do_POST(self):
-        path = urlparse(self.path).path
-        if path == "/api/session":
-            try:
-                length = int(self.headers.get("Content-Length", 0))
-                if length > 1_000_000:
-                    self._json_response({"error": "Payload too large"}, 413)
-                    return
-                body = json.loads(self.rfile.read(length)) if length else {}
-                if not isinstance(body, dict):
-                    self._json_response({"error": "Expected JSON object"}, 400)
-                    return
-            except (json.JSONDecodeError, ValueError):
-                self._json_response({"error": "Invalid JSON"}, 400)
-                return
-            result, code = upsert_session(body)
-            self._json_response(result, code)
+        route = self._POST_ROUTES.get(_route_path(self.path))
+        if route is not None:
+            route(self)
         else:
-            self._json_response({"error": "Not found"}, 404)
+            self._send_json_bytes(_NOT_FOUND, 404)
 
     def do_DELETE(self):
-        path = urlparse(self.path).path
+        path = _route_path(self.path)
         if path.startswith("/api/session/"):
             sid = path[len("/api/session/"):]
             result, code = delete_session(sid)
             self._json_response(result, code)
         else:
-            self._json_response({"error": "Not found"}, 404)
+            self._send_json_bytes(_NOT_FOUND, 404)
 
     def do_OPTIONS(self):
-        self.send_response(204)
-        self._cors_headers()
-        self.end_headers()
+        self._write_response(204, _CORS_HEADERS)
+
+    def _write_response(self, code, headers, body=None):
+        """Write status line, prebuilt ``headers`` and ``body`` in one call.
+
+        ``body=None`` means no body and no Content-Length (204/304 responses).
+        """
+        head = _status_line(self.protocol_version, code) + headers
+        if body is None:
+            self.wfile.write(head + b"\r\n")
+        else:
+            self.wfile.write(head + b"Content-Length: %d\r\n\r\n" % len(body) + body)
 
     def _json_response(self, data, code):
-        body = json.dumps(data).encode()
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self._cors_headers()
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _cors_headers(self):
-        self.send_header("Access-Control-Allow-Origin", "http://localhost:7777")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self._send_json_bytes(_json_bytes(data), code)
+
+    def _send_json_bytes(self, body, code):
+        self._write_response(code, _JSON_HEADERS, body)
+
+    def _write_stream(self, code, headers, pieces):
+        """Send ``pieces`` as they are produced, without a Content-Length.
+
+        The body is delimited by closing the connection.
+        """
+        write = self.wfile.write
+        write(_status_line(self.protocol_version, code) + headers + b"Connection: close\r\n\r\n")
+        for piece in pieces:
+            write(piece)
+
+    def _serve_sessions(self):
+        if len(sessions) > SESSIONS_STREAM_MIN:
+            # Too large to be worth holding as one cached blob; no ETag either,
+            # since that would need the whole body up front.
+            self._write_stream(200, _SESSIONS_HEADERS, iter_sessions_json())
+            return
+        body, etag, gzip_state = get_sessions_json_bytes()
+        if gzip_state is not None and _accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            etag = etag[:-1] + b'-gz"'  # distinct validator per encoding
+            headers = _SESSIONS_GZIP_HEADERS + b"ETag: " + etag + b"\r\n"
+            if self.headers.get("If-None-Match") == etag.decode():
+                self._write_response(304, headers)
+            else:
+                self._write_response(200, headers, finish_gzip(gzip_state))
+            return
+        headers = _SESSIONS_HEADERS + b"ETag: " + etag + b"\r\n"
+        if self.headers.get("If-None-Match") == etag.decode():
+            self._write_response(304, headers)
+        else:
+            self._write_response(200, headers, stamp_timestamp(body))
 
     def _serve_html(self):
-        html = DASHBOARD_HTML.replace("{{LOGO_DATA_URI}}", LOGO_DATA_URI)
-        html = html.replace("{{LOGO_DISPLAY}}", "block" if LOGO_DATA_URI else "none")
-        html = html.replace("{{GUS_LOGO_URI}}", GUS_LOGO_URI)
-        html = html.replace("{{GUS_LOGO_DISPLAY}}", "block" if GUS_LOGO_URI else "none")
-        html = html.replace("{{LOGO_LEFT_URI}}", LOGO_LEFT_URI)
-        html = html.replace("{{LOGO_LEFT_DISPLAY}}", "block" if LOGO_LEFT_URI else "none")
-        body = html.encode()
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.end_headers()
-        self.wfile.write(body)
+        headers = _HTML_HEADERS + b"ETag: " + DASHBOARD_HTML_ETAG + b"\r\n"
+        if self.headers.get("If-None-Match") == DASHBOARD_HTML_ETAG.decode():
+            self._write_response(304, headers)
+        else:
+            self._write_response(200, headers, DASHBOARD_HTML_BYTES)
+
+    def _serve_logo(self, path):
+        headers, etag, body = _LOGO_ASSETS[path]
+        if self.headers.get("If-None-Match") == etag.decode():
+            self._write_response(304, headers)
+        else:
+            self._write_response(200, headers, body)
+
+    def _launch_pwsh(self):
+        try:
+            subprocess.Popen(["wt", "new-tab", "pwsh"], creationflags=_NO_WINDOW)
+            self._json_response({"ok": True}, 200)
+        except Exception as e:
+            self._json_response({"error": str(e)}, 500)
+
+    def _post_session(self):
+        # Requiring application/json also means a page in the browser cannot
+        # post here as a "simple" cross-origin request that skips preflight.
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.partition(";")[0].strip().lower() != "application/json":
+            self._json_response({"error": "Expected Content-Type: application/json"}, 415)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+            if length > MAX_POST_BYTES:
+                self._json_response({"error": "Payload too large"}, 413)
+                return
+            body = _json_loads(self.rfile.read(length)) if length else {}
+            if not isinstance(body, dict):
+                self._json_response({"error": "Expected JSON object"}, 400)
+                return
+        except ValueError:
+            self._json_response({"error": "Invalid JSON"}, 400)
+            return
+        result, code = upsert_session(body)
+        self._json_response(result, code)
 
     def log_message(self, format, *args):
         pass  # suppress access logs
 
+    # Exact-path routes. Logos and DELETE /api/session/<sid> are matched
+    # separately since their paths are not fixed.
+    _GET_ROUTES = {
+        "/": _serve_html,
+        "/api/sessions": _serve_sessions,
+        "/api/launch-pwsh": _launch_pwsh,
+    }
+    _POST_ROUTES = {
+        "/api/session": _post_session,
+    }
+
+
+HTTP_WORKERS = 16
+
+
+class DashboardServer(HTTPServer):
+    """HTTPServer that hands each connection to a fixed pool of worker threads.
+
+    ThreadingHTTPServer starts a fresh thread per connection; for responses
+    this small, that spawn/teardown is most of the cost of a poll or POST.
+    """
+
+    # socketserver's default listen backlog is 5; a burst of hook POSTs from
+    # many sessions plus dashboard polls can exceed that and get refused.
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=HTTP_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard-http")
+        self._active = set()  # sockets currently being served
+        self._active_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        with self._active_lock:
+            self._active.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._active_lock:
+                self._active.discard(request)
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        # Pool workers are joined at interpreter exit; unblock any still
+        # waiting on a client so shutdown is not held up by the read timeout.
+        with self._active_lock:
+            active = list(self._active)
+        for request in active:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
 
 # ---------------------------------------------------------------------------
 # Dashboard HTML
@@ -1296,33 +1820,60 @@ def _load_dashboard_html_template() -> str:
         raise RuntimeError(f"Could not load dashboard template at {template_path}: {e}")
 
 
+def render_dashboard_html() -> bytes:
+    """Fill the logo placeholders and encode the page once."""
+    html = DASHBOARD_HTML.replace("{{LOGO_URL}}", LOGO_URL)
+    html = html.replace("{{LOGO_DISPLAY}}", "block" if LOGO_URL else "none")
+    html = html.replace("{{GUS_LOGO_URL}}", GUS_LOGO_URL)
+    html = html.replace("{{GUS_LOGO_DISPLAY}}", "block" if GUS_LOGO_URL else "none")
+    html = html.replace("{{LOGO_LEFT_URL}}", LOGO_LEFT_URL)
+    html = html.replace("{{LOGO_LEFT_DISPLAY}}", "block" if LOGO_LEFT_URL else "none")
+    return html.encode("utf-8")
+
+
+def _strong_etag(body: bytes) -> bytes:
+    return b'"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest().encode()
+
+
 DASHBOARD_HTML = _load_dashboard_html_template()
+DASHBOARD_HTML_BYTES = render_dashboard_html()  # re-rendered by main() once logos load
+DASHBOARD_HTML_ETAG = _strong_etag(DASHBOARD_HTML_BYTES)
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def load_logo(path_str):
-    """Load an image file and return a data URI, or empty string on failure."""
+def load_logo(path_str, route):
+    """Load an image file, serve it at ``route`` and return its URL, or empty string on failure.
+
+    The URL carries the image's ETag as a version, so the response can be
+    cached as immutable and still change when the file does.
+    """
     try:
         p = Path(path_str)
         if not p.exists():
             print(f"Warning: logo file not found: {p}")
             return ""
         data = p.read_bytes()
-        b64 = base64.b64encode(data).decode()
         ext = p.suffix.lower().lstrip(".")
         mime = {"jpg": "jpeg", "jpeg": "jpeg", "png": "png",
                 "gif": "gif", "svg": "svg+xml", "webp": "webp"}.get(ext, "jpeg")
-        return f"data:image/{mime};base64,{b64}"
+        etag = _strong_etag(data)
+        headers = (
+            b"Content-Type: image/" + mime.encode() + b"\r\n"
+            b"Cache-Control: public, max-age=31536000, immutable\r\n"
+            b"ETag: " + etag + b"\r\n"
+        )
+        _LOGO_ASSETS[route] = (headers, etag, data)
+        return f"{route}?v={etag[1:-1].decode()}"
     except Exception as e:
         print(f"Warning: could not load logo: {e}")
         return ""
 
 
 def main():
-    global LOGO_DATA_URI, GUS_LOGO_URI, LOGO_LEFT_URI
+    global LOGO_URL, GUS_LOGO_URL, LOGO_LEFT_URL, DASHBOARD_HTML_BYTES, DASHBOARD_HTML_ETAG
 
     parser = argparse.ArgumentParser(
         description="Workstate Dashboard - local multi-session status aggregator"
@@ -1350,26 +1901,28 @@ def main():
                 args.logo_left = str(candidate)
                 break
     if args.logo:
-        LOGO_DATA_URI = load_logo(args.logo)
-        if LOGO_DATA_URI:
+        LOGO_URL = load_logo(args.logo, "/logo/header")
+        if LOGO_URL:
             print(f"Header logo loaded: {args.logo}")
     # Auto-load GUS.ai logo from images/gusai_logo.png
     if images_dir.exists():
         for ext in ("png", "jpg", "jpeg", "svg", "webp"):
             candidate = images_dir / f"gusai_logo.{ext}"
             if candidate.exists():
-                GUS_LOGO_URI = load_logo(str(candidate))
-                if GUS_LOGO_URI:
+                GUS_LOGO_URL = load_logo(str(candidate), "/logo/gus")
+                if GUS_LOGO_URL:
                     print(f"GUS.ai logo loaded: {candidate}")
                 break
     if args.logo_left:
-        LOGO_LEFT_URI = load_logo(args.logo_left)
-        if LOGO_LEFT_URI:
+        LOGO_LEFT_URL = load_logo(args.logo_left, "/logo/left")
+        if LOGO_LEFT_URL:
             print(f"Left logo loaded: {args.logo_left}")
-    if not any([LOGO_DATA_URI, LOGO_LEFT_URI]):
+    if not any([LOGO_URL, LOGO_LEFT_URL]):
         print(f"Tip: Drop images into {images_dir}/ to add logos:")
         print(f"  logo.png       -> header logo")
         print(f"  logo-left.png  -> bottom-left watermark")
+    DASHBOARD_HTML_BYTES = render_dashboard_html()
+    DASHBOARD_HTML_ETAG = _strong_etag(DASHBOARD_HTML_BYTES)
 
     # Start background threads
     threading.Thread(target=sweeper, daemon=True).start()
@@ -1380,7 +1933,7 @@ def main():
     # Do initial scan immediately
     scan_claude_sessions()
 
-    server = ThreadingHTTPServer(("127.0.0.1", args.port), DashboardHandler)
+    server = DashboardServer(("127.0.0.1", args.port), DashboardHandler)
     print(f"Workstate Dashboard: http://localhost:{args.port}")
     print("Press Ctrl+C to stop.")
 
@@ -1389,6 +1942,7 @@ def main():
     except KeyboardInterrupt:
         print("\nDashboard stopped.")
         server.shutdown()
+        server.server_close()
 
 
 if __name__ == "__main__":